@@ -1,5 +1,4 @@
 import re
-from lxml import etree
 
 
 def hex_pattern():
@@ -74,13 +73,24 @@ def recolor_svg(svg_root, color):
                 element.set(attr, new_rgb)
 
 
-input_svg = "C:\\Users\\Lenovo\\Desktop\\input.svg"  # 输入SVG文件路径
-output_svg = "C:\\Users\\Lenovo\\Desktop\\output.svg"  # 输出SVG文件路径
-color = "#00ff00"  # 十六进制颜色
+def load_svg(path: str):
+    from lxml import etree  # 延迟导入, 只有真正读写 SVG 时才加载 lxml
 
-parser = etree.XMLParser(remove_blank_text=True)
-tree = etree.parse(input_svg, parser)
-root = tree.getroot()
+    parser = etree.XMLParser(remove_blank_text=True)
+    return etree.parse(path, parser)
 
-recolor_svg(root, color)
-tree.write(output_svg, pretty_print=True, encoding="utf-8", xml_declaration=True)
+
+def save_svg(tree, path: str) -> None:
+    tree.write(path, pretty_print=True, encoding="utf-8", xml_declaration=True)
+
+
+if __name__ == "__main__":
+    input_svg = "C:\\Users\\Lenovo\\Desktop\\input.svg"  # 输入SVG文件路径
+    output_svg = "C:\\Users\\Lenovo\\Desktop\\output.svg"  # 输出SVG文件路径
+    color = "#00ff00"  # 十六进制颜色
+
+    tree = load_svg(input_svg)
+    root = tree.getroot()
+
+    recolor_svg(root, color)
+    save_svg(tree, output_svg)
@@ -0,0 +1,220 @@
+from typing import Tuple
+
+import numpy as np
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QColor, QImage, qPremultiply
+
+# fill_mask / mask_to_image 写入的都是预乘像素, 只支持画布使用的格式
+SUPPORTED_FORMATS = (QImage.Format_ARGB32_Premultiplied,)
+
+FILL_WINDOW = 64  # 填充的初始窗口边长, 不够时逐步扩大
+
+
+def image_view(image: QImage) -> np.ndarray:
+    """返回 QImage 像素缓冲区的零拷贝 uint32 视图, 形状为 (高, 宽)"""
+    if image.format() not in SUPPORTED_FORMATS:
+        raise ValueError("Unsupported image format")
+
+    ptr = image.bits()  # 非 const 访问, 必要时会先 detach
+    ptr.setsize(image.sizeInBytes())
+    buf = np.frombuffer(ptr, dtype=np.uint32)
+    buf = buf.reshape(image.height(), image.bytesPerLine() // 4)
+    return buf[:, : image.width()]  # 去掉行尾对齐填充
+
+
+def _match(buf: np.ndarray, seed: np.uint32, tolerance: int) -> np.ndarray:
+    exact = buf == seed
+    if tolerance <= 0:
+        return exact
+
+    # 只对不完全相等的像素逐通道比较, 布尔索引不会拷贝整个窗口
+    others = ~exact
+    channels = buf[others].view(np.uint8).reshape(-1, 4)
+    seed_channels = np.array([seed], dtype=np.uint32).view(np.uint8)
+    diff = np.maximum(channels, seed_channels) - np.minimum(channels, seed_channels)
+    near = (diff <= tolerance).view(np.uint32).ravel()
+    exact[others] = near == 0x01010101  # 四个通道都在容差内
+    return exact
+
+
+def _runs(match: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """一次性找出所有行的连续可填充段, 返回 (行, 左, 右), 右边界不包含"""
+    height, width = match.shape
+    flat = match.ravel()
+
+    # 值发生变化的位置和每行行首都是段边界, 按位置标记后自然有序
+    change = np.empty((height, width), dtype=bool)
+    change[:, 0] = True
+    np.not_equal(match[:, 1:], match[:, :-1], out=change[:, 1:])
+    breaks = np.flatnonzero(change)
+    starts = breaks[flat[breaks]]
+    ends = np.append(breaks[1:], flat.size)[flat[breaks]]
+
+    rows = starts // width
+    return rows, starts - rows * width, ends - rows * width
+
+
+def _ramp(counts: np.ndarray) -> np.ndarray:
+    """把每个长度 n 展开成 0..n-1 并拼接"""
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+
+def _root_labels(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """向量化并查集: 按边 (a, b) 合并, 返回每个节点的根"""
+    parent = np.arange(count)
+    while True:
+        pa, pb = parent[a], parent[b]
+        differ = pa != pb
+        if not differ.any():
+            return parent
+
+        pa, pb = pa[differ], pb[differ]
+        np.minimum.at(parent, np.maximum(pa, pb), np.minimum(pa, pb))
+
+        # 路径压缩, 直到每个节点都直接指向根
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def _component(match: np.ndarray, x: int, y: int) -> Tuple[np.ndarray, QRect]:
+    """在匹配掩码中找出 (x, y) 所在的连通区域, 返回其包围盒内的掩码及包围盒"""
+    width = match.shape[1]
+    rows, lefts, rights = _runs(match)
+
+    # 相邻两行中横向重叠的段互相连通 (4 邻接)
+    stride = width + 1
+    start_keys = rows * stride + lefts
+    end_keys = rows * stride + rights
+    below = (rows + 1) * stride
+    lo = np.searchsorted(end_keys, below + lefts, side="right")
+    hi = np.searchsorted(start_keys, below + rights, side="left")
+    counts = np.maximum(hi - lo, 0)
+
+    upper = np.repeat(np.arange(rows.size), counts)
+    lower = np.repeat(lo, counts) + _ramp(counts)
+
+    roots = _root_labels(rows.size, upper, lower)
+    seed_run = np.searchsorted(start_keys, y * stride + x, side="right") - 1
+    picked = roots == roots[seed_run]
+
+    top, bottom = int(rows[picked][0]), int(rows[picked][-1]) + 1
+    x_min, x_max = int(lefts[picked].min()), int(rights[picked].max())
+
+    # 包围盒内的匹配像素, 去掉不属于该连通区域的段
+    mask = match[top:bottom, x_min:x_max].copy()
+    others = ~picked & (rows >= top) & (rows < bottom)
+    others &= (lefts < x_max) & (rights > x_min)
+    starts = np.maximum(lefts[others], x_min) - x_min
+    lengths = np.minimum(rights[others], x_max) - x_min - starts
+    base = (rows[others] - top) * (x_max - x_min) + starts
+    mask.ravel()[np.repeat(base, lengths) + _ramp(lengths)] = False
+
+    return mask, QRect(x_min, top, x_max - x_min, bottom - top)
+
+
+def _open(
+    outside: np.ndarray, edge: np.ndarray, seed: np.uint32, tolerance: int
+) -> bool:
+    """连通区域在窗口边上的像素 (edge) 是否与窗口外相邻的可填充像素相接"""
+    return bool(edge.any() and _match(outside[edge], seed, tolerance).any())
+
+
+def _grow_match(
+    buf: np.ndarray,
+    match: np.ndarray,
+    old: Tuple[int, int, int, int],
+    new: Tuple[int, int, int, int],
+    seed: np.uint32,
+    tolerance: int,
+) -> np.ndarray:
+    """把窗口 old 的匹配掩码扩展到窗口 new, 只比较新增部分的像素"""
+    left, top, right, bottom = new
+    o_left, o_top, o_right, o_bottom = old
+    inner = slice(o_top - top, o_bottom - top)
+
+    grown = np.empty((bottom - top, right - left), dtype=bool)
+    grown[inner, o_left - left : o_right - left] = match
+    grown[: o_top - top] = _match(buf[top:o_top, left:right], seed, tolerance)
+    grown[o_bottom - top :] = _match(buf[o_bottom:bottom, left:right], seed, tolerance)
+    grown[inner, : o_left - left] = _match(
+        buf[o_top:o_bottom, left:o_left], seed, tolerance
+    )
+    grown[inner, o_right - left :] = _match(
+        buf[o_top:o_bottom, o_right:right], seed, tolerance
+    )
+    return grown
+
+
+def flood_fill_mask(
+    buf: np.ndarray, x: int, y: int, tolerance: int = 0
+) -> Tuple[np.ndarray, QRect]:
+    """从种子点向外扩展窗口填充, 返回连通区域在其包围盒内的掩码及包围盒
+
+    只在窗口内比较颜色和标记连通区域; 区域从某条窗口边漏出时,
+    把该方向的窗口扩大一倍, 只比较新增部分的颜色后重新标记,
+    耗时随填充区域大小而不是画布大小增长
+    """
+    height, width = buf.shape
+    seed = buf[y, x]
+    half = FILL_WINDOW // 2
+    left, top = max(x - half, 0), max(y - half, 0)
+    right, bottom = min(x + half + 1, width), min(y + half + 1, height)
+
+    match = _match(buf[top:bottom, left:right], seed, tolerance)
+    while True:
+        mask, rect = _component(match, x - left, y - top)
+        rect.translate(left, top)
+        cols = slice(rect.left(), rect.right() + 1)
+        rows = slice(rect.top(), rect.bottom() + 1)
+
+        grow_w, grow_h = right - left, bottom - top
+        new_left, new_top, new_right, new_bottom = left, top, right, bottom
+        if rect.left() == left > 0 and _open(
+            buf[rows, left - 1], mask[:, 0], seed, tolerance
+        ):
+            new_left = max(left - grow_w, 0)
+        if rect.top() == top > 0 and _open(
+            buf[top - 1, cols], mask[0], seed, tolerance
+        ):
+            new_top = max(top - grow_h, 0)
+        if rect.right() == right - 1 < width - 1 and _open(
+            buf[rows, right], mask[:, -1], seed, tolerance
+        ):
+            new_right = min(right + grow_w, width)
+        if rect.bottom() == bottom - 1 < height - 1 and _open(
+            buf[bottom, cols], mask[-1], seed, tolerance
+        ):
+            new_bottom = min(bottom + grow_h, height)
+
+        old = (left, top, right, bottom)
+        new = (new_left, new_top, new_right, new_bottom)
+        if (new_right - new_left) * (new_bottom - new_top) * 2 > width * height:
+            new = (0, 0, width, height)  # 接近整个画布时一步到位, 省去最后几次重算
+        if new == old:
+            return mask, rect
+        match = _grow_match(buf, match, old, new, seed, tolerance)
+        left, top, right, bottom = new
+
+
+def premultiplied_argb(color: QColor) -> np.uint32:
+    return np.uint32(qPremultiply(color.rgba()))
+
+
+def fill_mask(buf: np.ndarray, mask: np.ndarray, rect: QRect, color: QColor) -> None:
+    """只在包围盒内写入颜色"""
+    region = buf[rect.top() : rect.bottom() + 1, rect.left() : rect.right() + 1]
+    region[mask] = premultiplied_argb(color)
+
+
+def mask_to_image(mask: np.ndarray, color: QColor) -> QImage:
+    """把掩码转换为与包围盒同尺寸的半透明覆盖图"""
+    height, width = mask.shape
+    pixels = np.zeros((height, width), dtype=np.uint32)
+    pixels[mask] = premultiplied_argb(color)
+    image = QImage(
+        pixels.data, width, height, width * 4, QImage.Format_ARGB32_Premultiplied
+    )
+    return image.copy()  # 拷贝一份, 不再引用 numpy 内存
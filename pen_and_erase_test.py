@@ -1,77 +1,416 @@
+import time
+
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget
-from PyQt5.QtGui import QPainter, QPixmap, QPen, QColor
-from PyQt5.QtCore import Qt, QPoint
+from PyQt5.QtGui import QPainter, QPainterPath, QPen, QColor
+from PyQt5.QtCore import Qt, QPoint, QPointF, QRect, QRectF, QLineF, QTimer
+
+import fill_utils
+from screen_topology import native_size, new_canvas
+from shape_recognizer import ShapeRecognizer
+
+
+class LaserStroke:
+    def __init__(self, pen, start):
+        self.pen = pen
+        self.path = QPainterPath(QPointF(start))
+        self.rect = QRect()  # 笔画包围盒 (含线宽)
+        self.stamp = None  # 松开鼠标的时间, 绘制中为 None
 
 
 class DrawingWidget(QWidget):
-    def __init__(self):
+    def __init__(self, canvas=None):
         super().__init__()
 
-        # 初始化透明背景画布
-        self.canvas = QPixmap(self.size())
-        self.canvas.fill(Qt.transparent)  # 透明背景
+        # 外部传入的画布 (如共享内存) 尺寸固定, 不随窗口缩放
+        self.fixed_canvas = canvas is not None
+        if self.fixed_canvas:
+            self.canvas = canvas
+        else:
+            # 初始化透明背景画布, 按所在屏幕的原生分辨率分配
+            self.canvas = new_canvas(self.size(), self.devicePixelRatioF())
+
+        # 正在绘制的笔画单独放一层, 识别完成后再合并到画布
+        self.stroke_layer = new_canvas(self.size(), self.canvas.devicePixelRatioF())
+        self.stroke_points = []
+        self.stroke_rect = QRect()
 
         # 默认是绘制模式
         self.drawing = False
+        self.stroke_tool = None  # 按下时的工具, 笔画途中切换工具不影响当前笔画
         self.last_point = QPoint()
 
         # 默认画笔（黑色）
         self.pen = QPen(Qt.black, 5, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
 
-        # 是否处于擦除模式
-        self.eraser_mode = False
+        # 当前工具: pen / eraser / fill / select / laser
+        self.tool = "pen"
+
+        self.fill_tolerance = 32  # 填充/选区的颜色容差 (0-255)
+
+        self.selection = None  # (掩码, 包围盒)
+        self.selection_overlay = None  # 选区高亮图
+        self.selection_color = QColor(0, 120, 215, 80)
+
+        # 形状识别: 笔画ID -> (笔画图像, 包围盒, 画笔)
+        self.shape_snap = True
+        self.recognition_debug = False  # 打开后在控制台输出每笔的识别耗时和队列深度
+        self.pending_strokes = {}
+        self.next_stroke_id = 0
+        self.recognizer = ShapeRecognizer(self)
+        self.recognizer.recognized.connect(self._on_shape_recognized)
+        self.recognizer.stats.connect(self._on_recognition_stats)
+
+        # 激光笔: 笔画不写入画布, 停留一段时间后淡出
+        self.laser_pen = QPen(
+            QColor(255, 40, 40), 6, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin
+        )
+        self.laser_hold = 2.0  # 淡出前停留时间 (秒)
+        self.laser_fade = 1.0  # 淡出时长 (秒)
+        self.laser_frame_ms = 16  # 淡出动画帧间隔
+        self.laser_strokes = []
+        self.current_laser = None  # 正在绘制的激光笔画
+        self.laser_timer = QTimer(self)
+        self.laser_timer.setSingleShot(True)  # 每次按需重新排期, 无笔画时不再触发
+        self.laser_timer.timeout.connect(self._laser_tick)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
+            if self.tool == "fill":
+                self.bucket_fill(event.pos())
+                return
+            if self.tool == "select":
+                self.select_region(event.pos())
+                return
+
             self.drawing = True
+            self.stroke_tool = self.tool
             self.last_point = event.pos()
+            if self.tool == "laser":
+                self.current_laser = LaserStroke(self.laser_pen, event.pos())
+                self.laser_strokes.append(self.current_laser)
+                return
+            self.stroke_points = [(event.x(), event.y())]
+            self.stroke_rect = QRect()
 
     def mouseMoveEvent(self, event):
         if self.drawing and event.buttons() & Qt.LeftButton:
-            painter = QPainter(self.canvas)
+            if self.stroke_tool == "laser":
+                self._extend_laser_stroke(event.pos())
+                return
 
-            if self.eraser_mode:
+            if self.stroke_tool == "eraser":
                 # 真正的擦除模式
+                painter = QPainter(self.canvas)
                 painter.setCompositionMode(QPainter.CompositionMode_Clear)
-                painter.setPen(
-                    QPen(Qt.transparent, 10, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-                )
+                pen = QPen(Qt.transparent, 10, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+                painter.setPen(pen)
                 print("Eraser mode active")  # 调试输出
             else:
                 # 绘制模式
+                painter = QPainter(self.stroke_layer)
                 painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
-                painter.setPen(self.pen)
+                pen = self.pen
+                painter.setPen(pen)
 
             # 绘制线条（从上一个点到当前点）
             painter.drawLine(self.last_point, event.pos())
             painter.end()
 
+            margin = round(pen.widthF()) + 1
+            dirty = QRect(self.last_point, event.pos()).normalized()
+            dirty = dirty.adjusted(-margin, -margin, margin, margin)
+            if self.stroke_tool != "eraser":
+                self.stroke_rect = self.stroke_rect.united(dirty)
+                self.stroke_points.append((event.x(), event.y()))
+
             self.last_point = event.pos()
-            self.update()  # 触发 paintEvent 更新显示
+            self.update(dirty)  # 只刷新线段所在区域
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
+            if self.drawing and self.stroke_tool == "laser":
+                self.current_laser.stamp = time.monotonic()
+                self.current_laser = None
+                self._laser_tick()
+            elif self.drawing and self.stroke_tool != "eraser":
+                self._finish_stroke()
             self.drawing = False
+            self.stroke_tool = None
+
+    def _cancel_stroke(self):
+        """丢弃正在绘制的笔画, 松开鼠标前清空画布或切换工具时调用"""
+        if self.current_laser is not None:
+            self.laser_strokes.remove(self.current_laser)
+            self.update(self.current_laser.rect)
+            self.current_laser = None
+        elif self.drawing and self.stroke_tool != "eraser":
+            rect = self.stroke_rect
+            painter = QPainter(self.stroke_layer)
+            painter.setCompositionMode(QPainter.CompositionMode_Clear)
+            painter.fillRect(rect, Qt.transparent)
+            painter.end()
+            self.stroke_points = []
+            self.stroke_rect = QRect()
+            self.update(rect)
+        self.drawing = False
+        self.stroke_tool = None
+
+    def _extend_laser_stroke(self, pos):
+        stroke = self.current_laser
+        stroke.path.lineTo(QPointF(pos))
+
+        margin = round(stroke.pen.widthF()) + 1
+        dirty = QRect(self.last_point, pos).normalized()
+        dirty = dirty.adjusted(-margin, -margin, margin, margin)
+        stroke.rect = stroke.rect.united(dirty)
+
+        self.last_point = pos
+        self.update(dirty)
+
+    def _laser_opacity(self, stroke, now):
+        if stroke.stamp is None:
+            return 1.0
+        fade_time = now - stroke.stamp - self.laser_hold
+        if fade_time <= 0:
+            return 1.0
+        return max(0.0, 1.0 - fade_time / self.laser_fade)
+
+    def _laser_tick(self):
+        now = time.monotonic()
+        next_ms = None
+        alive = []
+
+        for stroke in self.laser_strokes:
+            if stroke.stamp is None:  # 仍在绘制, 松开时再排期
+                alive.append(stroke)
+                continue
+
+            age = now - stroke.stamp
+            if age < self.laser_hold:
+                alive.append(stroke)
+                wait_ms = round((self.laser_hold - age) * 1000)
+            else:
+                self.update(stroke.rect)  # 只重绘淡出中的笔画
+                if age >= self.laser_hold + self.laser_fade:
+                    continue  # 已完全消失, 最后刷新一次后移除
+                alive.append(stroke)
+                wait_ms = self.laser_frame_ms
+
+            next_ms = wait_ms if next_ms is None else min(next_ms, wait_ms)
+
+        self.laser_strokes = alive
+
+        if next_ms is None:
+            self.laser_timer.stop()
+        else:
+            self.laser_timer.start(max(self.laser_frame_ms, next_ms))
+
+    def _finish_stroke(self):
+        rect = self.stroke_rect.intersected(self.rect())
+        self.stroke_rect = QRect()
+        if rect.isEmpty():
+            return
+
+        piece = self.stroke_layer.copy(self._to_device(rect))
+        piece.setDevicePixelRatio(self.stroke_layer.devicePixelRatioF())
+        painter = QPainter(self.stroke_layer)
+        painter.setCompositionMode(QPainter.CompositionMode_Clear)
+        painter.fillRect(rect, Qt.transparent)
+        painter.end()
+
+        stroke_id = self.next_stroke_id
+        self.next_stroke_id += 1
+        self.pending_strokes[stroke_id] = (piece, rect, QPen(self.pen))
+
+        if self.shape_snap:
+            # 识别在后台线程进行, 此处只提交点列
+            self.recognizer.submit(stroke_id, self.stroke_points)
+        else:
+            self._on_shape_recognized(stroke_id, None)
+        self.stroke_points = []
+
+    def _on_shape_recognized(self, stroke_id, shape):
+        entry = self.pending_strokes.pop(stroke_id, None)
+        if entry is None:  # 画布已被清空
+            return
+        piece, rect, pen = entry
+
+        painter = QPainter(self.canvas)
+        if shape is None:
+            painter.drawImage(rect.topLeft(), piece)
+            dirty = rect
+        else:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(pen)
+            dirty = rect.united(self._draw_shape(painter, shape, pen))
+        painter.end()
+
+        self.update(dirty)
+
+    def _draw_shape(self, painter, shape, pen):
+        p1, p2 = (QPointF(*pt) for pt in shape.points)
+        bounds = QRectF(p1, p2).normalized()
+
+        if shape.kind == "line":
+            painter.drawLine(p1, p2)
+        elif shape.kind == "rect":
+            painter.drawRect(bounds)
+        elif shape.kind == "ellipse":
+            painter.drawEllipse(bounds)
+        elif shape.kind == "arrow":
+            painter.drawLine(p1, p2)
+            head_len = max(pen.widthF() * 4, QLineF(p1, p2).length() * 0.15)
+            for angle in (150, -150):
+                wing = QLineF(p2, p1)
+                wing.setLength(head_len)
+                wing.setAngle(QLineF(p1, p2).angle() + angle)
+                painter.drawLine(wing)
+                bounds = bounds.united(QRectF(wing.p1(), wing.p2()).normalized())
+
+        margin = pen.widthF() + 1
+        return bounds.adjusted(-margin, -margin, margin, margin).toAlignedRect()
+
+    def _on_recognition_stats(self, elapsed_ms, queue_depth):
+        if self.recognition_debug:
+            print(f"Shape recognition: {elapsed_ms:.1f} ms, queue depth: {queue_depth}")
 
     def paintEvent(self, event):
         # 动态调整画布大小
-        if self.canvas.size() != self.size():
-            new_canvas = QPixmap(self.size())
-            new_canvas.fill(Qt.transparent)
-            painter = QPainter(new_canvas)
-            painter.drawPixmap(0, 0, self.canvas)
-            painter.end()
-            self.canvas = new_canvas
+        dpr = self.devicePixelRatioF()
+        if not self.fixed_canvas and (
+            self.canvas.size() != native_size(self.size(), dpr)
+            or self.canvas.devicePixelRatioF() != dpr  # 移动到了另一块屏幕
+        ):
+            self.canvas = self._resized(self.canvas)
+        if self.stroke_layer.size() != native_size(
+            self.size(), self.canvas.devicePixelRatioF()
+        ):
+            self.stroke_layer = self._resized(self.stroke_layer)
 
+        # 只重绘脏区域
         painter = QPainter(self)
-        painter.drawPixmap(0, 0, self.canvas)
+        source = self._to_device(event.rect())
+        painter.drawImage(event.rect(), self.canvas, source)
+        for piece, rect, _ in self.pending_strokes.values():
+            if rect.intersects(event.rect()):
+                painter.drawImage(rect.topLeft(), piece)
+        painter.drawImage(event.rect(), self.stroke_layer, source)
+
+        if self.selection is not None:
+            rect = self.selection[1]
+            painter.drawImage(rect.topLeft(), self.selection_overlay)
+            painter.setPen(QPen(self.selection_color.darker(), 1, Qt.DashLine))
+            painter.drawRect(rect)
+
+        if self.laser_strokes:
+            now = time.monotonic()
+            painter.setRenderHint(QPainter.Antialiasing)
+            for stroke in self.laser_strokes:
+                if not stroke.rect.intersects(event.rect()):
+                    continue
+                painter.setOpacity(self._laser_opacity(stroke, now))
+                painter.setPen(stroke.pen)
+                painter.drawPath(stroke.path)
+
+    def _resized(self, image):
+        # 旧图像按自身像素比绘制, 逻辑坐标保持不变
+        new_image = new_canvas(self.size(), self.devicePixelRatioF())
+        painter = QPainter(new_image)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        return new_image
+
+    def _to_device(self, rect):
+        """逻辑坐标 -> 画布像素坐标"""
+        dpr = self.canvas.devicePixelRatioF()
+        return QRectF(
+            rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr
+        ).toAlignedRect()
+
+    def _to_logical(self, rect):
+        """画布像素坐标 -> 逻辑坐标"""
+        dpr = self.canvas.devicePixelRatioF()
+        return QRectF(
+            rect.x() / dpr, rect.y() / dpr, rect.width() / dpr, rect.height() / dpr
+        ).toAlignedRect()
+
+    def _device_point(self, pos):
+        dpr = self.canvas.devicePixelRatioF()
+        return QPoint(int(pos.x() * dpr), int(pos.y() * dpr))
+
+    def bucket_fill(self, pos):
+        point = self._device_point(pos)
+        if not self.canvas.rect().contains(point):
+            return
+
+        buf = fill_utils.image_view(self.canvas)
+        mask, rect = fill_utils.flood_fill_mask(
+            buf, point.x(), point.y(), self.fill_tolerance
+        )
+        fill_utils.fill_mask(buf, mask, rect, self.pen.color())
+
+        rect = self._to_logical(rect)
+        self.update(rect)  # 只刷新受影响的包围盒
+
+    def select_region(self, pos):
+        self.clear_selection()
+        point = self._device_point(pos)
+        if not self.canvas.rect().contains(point):
+            return
+
+        buf = fill_utils.image_view(self.canvas)
+        mask, rect = fill_utils.flood_fill_mask(
+            buf, point.x(), point.y(), self.fill_tolerance
+        )
+        overlay = fill_utils.mask_to_image(mask, self.selection_color)
+        overlay.setDevicePixelRatio(self.canvas.devicePixelRatioF())
+
+        rect = self._to_logical(rect)
+        self.selection = (mask, rect)
+        self.selection_overlay = overlay
+        self.update(rect.adjusted(0, 0, 1, 1))  # 包含虚线边框
+
+    def clear_selection(self):
+        if self.selection is None:
+            return
+        rect = self.selection[1]
+        self.selection = None
+        self.selection_overlay = None
+        self.update(rect.adjusted(0, 0, 1, 1))
 
     def clear_canvas(self):
+        self._cancel_stroke()
+        self.clear_selection()
+        self.pending_strokes.clear()
+        self.laser_strokes.clear()
+        self.laser_timer.stop()
+        self.stroke_layer.fill(Qt.transparent)
         self.canvas.fill(Qt.white)
         self.update()
 
+    def set_tool(self, tool):
+        self._cancel_stroke()
+        if tool != "select":
+            self.clear_selection()
+        self.tool = tool
+
+    def _toggle_tool(self, tool, enabled):
+        if enabled:
+            self.set_tool(tool)
+        elif self.tool == tool:  # 取消当前工具时回到画笔
+            self.set_tool("pen")
+
     def toggle_eraser(self, enabled):
-        self.eraser_mode = enabled
+        self._toggle_tool("eraser", enabled)
+
+    def toggle_fill(self, enabled):
+        self._toggle_tool("fill", enabled)
+
+    def toggle_select(self, enabled):
+        self._toggle_tool("select", enabled)
+
+    def toggle_laser(self, enabled):
+        self._toggle_tool("laser", enabled)
 
 
 class MainWindow(QMainWindow):
@@ -84,7 +423,12 @@ class MainWindow(QMainWindow):
         self.drawing_widget = DrawingWidget()
         self.setCentralWidget(self.drawing_widget)
 
-        from PyQt5.QtWidgets import QPushButton, QVBoxLayout, QHBoxLayout
+        from PyQt5.QtWidgets import (
+            QPushButton,
+            QVBoxLayout,
+            QHBoxLayout,
+            QButtonGroup,
+        )
 
         toolbar = QWidget()
         toolbar.setStyleSheet("background-color: rgba(200, 200, 200, 150);")
@@ -97,8 +441,30 @@ class MainWindow(QMainWindow):
         eraser_btn.setCheckable(True)
         eraser_btn.toggled.connect(self.drawing_widget.toggle_eraser)
 
+        fill_btn = QPushButton("油漆桶")
+        fill_btn.setCheckable(True)
+        fill_btn.toggled.connect(self.drawing_widget.toggle_fill)
+
+        select_btn = QPushButton("选区")
+        select_btn.setCheckable(True)
+        select_btn.toggled.connect(self.drawing_widget.toggle_select)
+
+        laser_btn = QPushButton("激光笔")
+        laser_btn.setCheckable(True)
+        laser_btn.toggled.connect(self.drawing_widget.toggle_laser)
+
+        # 工具按钮互斥, 取消勾选后回到画笔
+        self.tool_btns = QButtonGroup(self)
+        self.tool_btns.setExclusive(False)
+        for btn in (eraser_btn, fill_btn, select_btn, laser_btn):
+            self.tool_btns.addButton(btn)
+        self.tool_btns.buttonToggled.connect(self._on_tool_toggled)
+
         layout.addWidget(clear_btn)
         layout.addWidget(eraser_btn)
+        layout.addWidget(fill_btn)
+        layout.addWidget(select_btn)
+        layout.addWidget(laser_btn)
         toolbar.setLayout(layout)
 
         main_layout = QVBoxLayout()
@@ -109,11 +475,17 @@ class MainWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+    def _on_tool_toggled(self, button, checked):
+        if not checked:
+            return
+        for other in self.tool_btns.buttons():
+            if other is not button:
+                other.setChecked(False)
+
 
 if __name__ == "__main__":
     app = QApplication([])
     window = MainWindow()
     window.showFullScreen()
     app.exec_()
-
-print("Done")
\ No newline at end of file
+    print("Done")
@@ -0,0 +1,146 @@
+import time
+
+_T0 = time.perf_counter()  # 进程启动计时起点, 需在导入 PyQt5 之前
+
+import sys
+from typing import List, Optional
+
+from PyQt5.QtCore import Qt, QObject, QTimer, QCoreApplication
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+SERVER_NAME = "PyScreenSketch"
+COMMANDS = ("toggle", "show", "hide", "quit")
+TIMEOUT_MS = 500
+
+# send_command 的结果
+REPLIED = "replied"
+NOT_RUNNING = "not running"  # 找不到套接字或连接被拒绝, 没有常驻进程
+NO_REPLY = "no reply"  # 常驻进程存在 (或无法确定), 但没有及时回复
+
+
+def _connect(socket: QLocalSocket, timeout_ms: int) -> Optional[str]:
+    """连接常驻进程, 成功返回 None, 失败返回 NOT_RUNNING 或 NO_REPLY"""
+    socket.connectToServer(SERVER_NAME)
+    if socket.waitForConnected(timeout_ms):
+        return None
+    if socket.error() in (
+        QLocalSocket.ServerNotFoundError,
+        QLocalSocket.ConnectionRefusedError,
+    ):
+        return NOT_RUNNING
+    return NO_REPLY
+
+
+def send_command(command: str, timeout_ms: int = TIMEOUT_MS) -> str:
+    """把命令发给常驻进程, 返回 REPLIED / NOT_RUNNING / NO_REPLY"""
+    socket = QLocalSocket()
+    failed = _connect(socket, timeout_ms)
+    if failed:
+        return failed
+
+    socket.write(command.encode() + b"\n")
+    socket.waitForBytesWritten(timeout_ms)
+    replied = socket.waitForReadyRead(timeout_ms)  # 等待常驻进程处理完毕
+    socket.disconnectFromServer()
+    return REPLIED if replied else NO_REPLY
+
+
+class ResidentServer(QObject):
+    """常驻进程: 预先构建好窗口并隐藏, 通过本地套接字接收命令"""
+
+    def __init__(self, windows: List, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.windows = windows
+        self.visible = False
+
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._handle_connection)
+
+    def listen(self) -> bool:
+        if self.server.listen(SERVER_NAME):
+            return True
+
+        # 名称已被占用: 确认没有进程在监听后, 才清理上次崩溃遗留的套接字
+        probe = QLocalSocket()
+        if _connect(probe, TIMEOUT_MS) != NOT_RUNNING:
+            probe.abort()
+            return False
+        QLocalServer.removeServer(SERVER_NAME)
+        return self.server.listen(SERVER_NAME)
+
+    def _handle_connection(self) -> None:
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self._handle_ready_read(s))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _handle_ready_read(self, socket: QLocalSocket) -> None:
+        while socket.canReadLine():
+            command = bytes(socket.readLine()).decode().strip()
+            self.execute(command)
+            socket.write(b"ok\n")
+            socket.flush()
+
+    def execute(self, command: str) -> None:
+        if command == "toggle":
+            command = "hide" if self.visible else "show"
+
+        if command == "show":
+            for window in self.windows:
+                window.show()
+                window.raise_()
+                window.activateWindow()
+            self.visible = True
+        elif command == "hide":
+            for window in self.windows:
+                window.hide()
+            self.visible = False
+        elif command == "quit":
+            self.server.close()
+            QTimer.singleShot(0, QCoreApplication.quit)
+
+
+def _report(kind: str) -> None:
+    print(f"{kind} start: {(time.perf_counter() - _T0) * 1000:.1f} ms")
+
+
+def main(argv: List[str]) -> int:
+    command = argv[1] if len(argv) > 1 else "toggle"
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}, expected one of {', '.join(COMMANDS)}")
+        return 2
+
+    result = send_command(command)
+    if result == REPLIED:
+        _report("Warm")
+        return 0
+    if result == NO_REPLY:  # 常驻进程忙, 不能再启动第二个
+        print(f"Resident process did not reply within {TIMEOUT_MS} ms")
+        return 1
+
+    if command in ("hide", "quit"):  # 没有常驻进程, 无需启动
+        return 0
+
+    # 冷启动: 只有这里才导入控件和画布模块
+    from PyQt5.QtWidgets import QApplication
+    from toolbar_rebuild import ToolBar
+    from pen_and_erase_test import MainWindow
+
+    app = QApplication(argv)
+    app.setQuitOnLastWindowClosed(False)  # 窗口全部隐藏后进程仍常驻
+
+    canvas = MainWindow()
+    canvas.setWindowState(Qt.WindowFullScreen)
+    tool_bar = ToolBar()
+    server = ResidentServer([canvas, tool_bar])
+    if not server.listen():
+        print(f"Cannot listen on {SERVER_NAME}: {server.server.errorString()}")
+        return 1
+    server.execute("show")
+
+    QTimer.singleShot(0, lambda: _report("Cold"))  # 首次进入事件循环时计时
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
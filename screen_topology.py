@@ -0,0 +1,150 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QPoint, QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QGuiApplication, QImage, QScreen
+
+CANVAS_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+
+class ScreenInfo(NamedTuple):
+    screen: QScreen
+    geometry: QRect  # 屏幕区域 (逻辑坐标)
+    available: QRect  # 去掉任务栏等之后的可用区域
+    dpr: float  # 设备像素比
+
+
+class ScreenTopology(QObject):
+    """缓存各屏幕的几何信息, 屏幕增删或参数变化时刷新"""
+
+    changed = pyqtSignal()
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.screens: List[ScreenInfo] = []
+        self.primary: Optional[ScreenInfo] = None
+        self._last_hit: Optional[ScreenInfo] = None  # 拖动时通常停留在同一屏幕
+
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self._handle_screen_added)
+        app.screenRemoved.connect(self._refresh)
+        app.primaryScreenChanged.connect(self._refresh)
+        for screen in app.screens():
+            self._watch(screen)
+
+        self._refresh()
+
+    def _watch(self, screen: QScreen) -> None:
+        screen.geometryChanged.connect(self._refresh)
+        screen.availableGeometryChanged.connect(self._refresh)
+        screen.logicalDotsPerInchChanged.connect(self._refresh)
+        screen.physicalDotsPerInchChanged.connect(self._refresh)
+
+    def _handle_screen_added(self, screen: QScreen) -> None:
+        self._watch(screen)
+        self._refresh()
+
+    def _refresh(self, *args) -> None:
+        app = QGuiApplication.instance()
+        self.screens = [
+            ScreenInfo(
+                screen,
+                screen.geometry(),
+                screen.availableGeometry(),
+                screen.devicePixelRatio(),
+            )
+            for screen in app.screens()
+        ]
+        primary = app.primaryScreen()
+        self.primary = next(
+            (info for info in self.screens if info.screen is primary),
+            self.screens[0] if self.screens else None,
+        )
+        self._last_hit = None
+        self.changed.emit()
+
+    def screen_at(self, point: QPoint) -> ScreenInfo:
+        """返回包含该点的屏幕, 点在所有屏幕之外时沿用上一次命中的屏幕"""
+        last = self._last_hit
+        if last is not None and last.geometry.contains(point):
+            return last
+
+        for info in self.screens:
+            if info.geometry.contains(point):
+                self._last_hit = info
+                return info
+
+        return last or self.primary
+
+    def screen_of(self, rect: QRect) -> ScreenInfo:
+        return self.screen_at(rect.center())
+
+    def walls(self, rect: QRect, info: ScreenInfo) -> Tuple[int, int, int, int]:
+        """矩形在所在屏幕上四个方向的边界 (左, 上, 右, 下)
+
+        与相邻屏幕相接、且相邻屏幕覆盖了矩形中心所在行/列的边不算边界,
+        继续延伸到相邻屏幕的外边; 只有桌面的外边缘 (包括屏幕高度不同留下的空白区)
+        才会挡住窗口, 矩形中心始终留在某块屏幕上
+        """
+        geo = info.geometry
+        left, top, right, bottom = geo.left(), geo.top(), geo.right(), geo.bottom()
+        center = rect.center()
+
+        extended = True
+        while extended:
+            extended = False
+            for other in self.screens:
+                o = other.geometry
+                rows = o.top() <= center.y() <= o.bottom()
+                cols = o.left() <= center.x() <= o.right()
+                if rows and o.right() + 1 == left:
+                    left, extended = o.left(), True
+                if rows and o.left() == right + 1:
+                    right, extended = o.right(), True
+                if cols and o.bottom() + 1 == top:
+                    top, extended = o.top(), True
+                if cols and o.top() == bottom + 1:
+                    bottom, extended = o.bottom(), True
+
+        return left, top, right, bottom
+
+    def margins(self, rect: QRect, info: ScreenInfo) -> Tuple[int, int, int, int]:
+        """矩形到四个方向边界的距离 (左, 上, 右, 下)"""
+        left, top, right, bottom = self.walls(rect, info)
+        return (
+            rect.left() - left,
+            rect.top() - top,
+            right - rect.right(),
+            bottom - rect.bottom(),
+        )
+
+    def clamp(
+        self, pos: QPoint, size: QSize, info: ScreenInfo, overflow: int = 0
+    ) -> QPoint:
+        """把窗口位置限制在桌面内, overflow 为允许超出桌面边缘的距离"""
+        left, top, right, bottom = self.walls(QRect(pos, size), info)
+        x = min(pos.x(), right + 1 - size.width() + overflow)
+        y = min(pos.y(), bottom + 1 - size.height() + overflow)
+        return QPoint(max(x, left - overflow), max(y, top - overflow))
+
+
+def native_size(size: QSize, dpr: float) -> QSize:
+    """逻辑尺寸对应的物理像素尺寸"""
+    return QSize(round(size.width() * dpr), round(size.height() * dpr))
+
+
+def new_canvas(size: QSize, dpr: float) -> QImage:
+    """按屏幕原生分辨率分配透明画布, 绘制时仍使用逻辑坐标"""
+    image = QImage(native_size(size, dpr), CANVAS_FORMAT)
+    image.setDevicePixelRatio(dpr)
+    image.fill(Qt.transparent)
+    return image
+
+
+_topology: Optional[ScreenTopology] = None
+
+
+def topology() -> ScreenTopology:
+    global _topology
+    if _topology is None:
+        _topology = ScreenTopology()
+    return _topology
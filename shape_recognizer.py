@@ -0,0 +1,182 @@
+import math
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QObject, QThread, QCoreApplication, pyqtSignal, pyqtSlot
+
+MAX_SAMPLES = 256  # 长笔画重采样上限, 保证识别耗时有界
+
+LINE_TOL = 0.04  # 直线: 平均偏离 / 长度
+CLOSED_TOL = 0.2  # 闭合: 首尾距离 / 包围盒对角线
+RECT_TOL = 0.05  # 矩形: 平均到边距离 / 包围盒对角线
+ELLIPSE_TOL = 0.08  # 椭圆: 平均径向误差
+ARROW_HEAD_MIN = 0.08  # 箭头头部长度 / 箭杆长度 下限
+ARROW_HEAD_MAX = 0.6  # 箭头头部长度 / 箭杆长度 上限
+
+
+class Shape(NamedTuple):
+    kind: str  # line / rect / ellipse / arrow
+    # line/arrow: 起点和终点, rect/ellipse: 左上和右下
+    points: Tuple[Tuple[float, float], ...]
+
+
+def _path_length(pts: np.ndarray) -> float:
+    return float(np.hypot(*np.diff(pts, axis=0).T).sum())
+
+
+def resample(pts: np.ndarray, count: int = MAX_SAMPLES) -> np.ndarray:
+    """按弧长均匀重采样"""
+    seg = np.hypot(*np.diff(pts, axis=0).T)
+    dist = np.concatenate(([0.0], np.cumsum(seg)))
+    if dist[-1] == 0:
+        return pts[:1]
+    target = np.linspace(0.0, dist[-1], min(count, len(pts)))
+    return np.column_stack(
+        (np.interp(target, dist, pts[:, 0]), np.interp(target, dist, pts[:, 1]))
+    )
+
+
+def _line_error(pts: np.ndarray) -> Tuple[float, np.ndarray, np.ndarray]:
+    """主成分拟合直线, 返回 (相对平均偏离, 起点, 终点)"""
+    center = pts.mean(axis=0)
+    centered = pts - center
+    _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    direction = vt[0]
+    proj = centered @ direction
+    resid = np.abs(centered @ vt[1]) if len(vt) > 1 else np.zeros(len(pts))
+    length = proj.max() - proj.min()
+    if length == 0:
+        return math.inf, pts[0], pts[-1]
+    start = center + direction * proj[0]
+    end = center + direction * proj[-1]
+    return float(resid.mean() / length), start, end
+
+
+def _rect_error(pts: np.ndarray, x0, y0, x1, y1, diag) -> float:
+    dist = np.min(
+        np.abs(
+            np.column_stack(
+                (pts[:, 0] - x0, pts[:, 0] - x1, pts[:, 1] - y0, pts[:, 1] - y1)
+            )
+        ),
+        axis=1,
+    )
+    return float(dist.mean() / diag)
+
+
+def _ellipse_error(pts: np.ndarray, x0, y0, x1, y1) -> float:
+    rx, ry = (x1 - x0) * 0.5, (y1 - y0) * 0.5
+    if rx == 0 or ry == 0:
+        return math.inf
+    cx, cy = x0 + rx, y0 + ry
+    radial = np.hypot((pts[:, 0] - cx) / rx, (pts[:, 1] - cy) / ry)
+    return float(np.abs(radial - 1.0).mean())
+
+
+def _as_tuple(*pts) -> Tuple[Tuple[float, float], ...]:
+    return tuple((float(p[0]), float(p[1])) for p in pts)
+
+
+def classify(points: List[Tuple[float, float]]) -> Optional[Shape]:
+    """把笔画拟合为直线/矩形/椭圆/箭头, 无法识别时返回 None"""
+    pts = np.asarray(points, dtype=float)
+    if len(pts) < 3:
+        return None
+
+    pts = resample(pts)
+    if len(pts) < 3:
+        return None
+
+    x0, y0 = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+    diag = math.hypot(x1 - x0, y1 - y0)
+    if diag < 8:  # 太小的笔画不处理
+        return None
+
+    if np.hypot(*(pts[-1] - pts[0])) <= diag * CLOSED_TOL:
+        rect_err = _rect_error(pts, x0, y0, x1, y1, diag)
+        ellipse_err = _ellipse_error(pts, x0, y0, x1, y1)
+        if rect_err <= RECT_TOL and rect_err * 2 < ellipse_err:
+            return Shape("rect", _as_tuple((x0, y0), (x1, y1)))
+        if ellipse_err <= ELLIPSE_TOL:
+            return Shape("ellipse", _as_tuple((x0, y0), (x1, y1)))
+        return None
+
+    # 箭头: 离起点最远的点为箭尖, 之前为箭杆, 之后为箭头
+    tip = int(np.argmax(np.hypot(*(pts - pts[0]).T)))
+    shaft, head = pts[: tip + 1], pts[tip:]
+    if len(shaft) >= 3 and len(head) >= 2:
+        ratio = _path_length(head) / _path_length(shaft)
+        shaft_err, start, _ = _line_error(shaft)
+        if ARROW_HEAD_MIN <= ratio <= ARROW_HEAD_MAX and shaft_err <= LINE_TOL:
+            return Shape("arrow", _as_tuple(start, pts[tip]))
+
+    line_err, start, end = _line_error(pts)
+    if line_err <= LINE_TOL:
+        return Shape("line", _as_tuple(start, end))
+
+    return None
+
+
+def _stop_thread(thread: QThread) -> None:
+    if thread.isRunning():
+        thread.quit()
+        thread.wait()
+
+
+class _RecognizerWorker(QObject):
+    finished = pyqtSignal(int, object, float)  # 笔画ID, 识别结果, 耗时(ms)
+
+    @pyqtSlot(int, object)
+    def process(self, stroke_id: int, points: List[Tuple[float, float]]) -> None:
+        start = time.perf_counter()
+        try:
+            shape = classify(points)
+        except (ValueError, np.linalg.LinAlgError):
+            shape = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.finished.emit(stroke_id, shape, elapsed_ms)
+
+
+class ShapeRecognizer(QObject):
+    """在后台线程识别笔画, GUI 线程只负责提交和接收结果"""
+
+    recognized = pyqtSignal(int, object)  # 笔画ID, Shape 或 None
+    stats = pyqtSignal(float, int)  # 单笔耗时(ms), 队列深度
+
+    _submit = pyqtSignal(int, object)
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.queue_depth = 0  # 已提交未返回的笔画数
+        self.last_elapsed_ms = 0.0
+
+        self._thread = QThread()
+        self._worker = _RecognizerWorker()
+        self._worker.moveToThread(self._thread)
+        self._submit.connect(self._worker.process)  # 跨线程, 自动排队
+        self._worker.finished.connect(self._on_finished)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+        # 识别器随窗口销毁时也要先停线程, lambda 只捕获线程, 不引用已销毁的 self
+        thread = self._thread
+        self.destroyed.connect(lambda: _stop_thread(thread))
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    def submit(self, stroke_id: int, points: List[Tuple[float, float]]) -> None:
+        self.queue_depth += 1
+        self._submit.emit(stroke_id, points)
+
+    def stop(self) -> None:
+        _stop_thread(self._thread)
+
+    def _on_finished(self, stroke_id: int, shape: Optional[Shape], elapsed_ms: float):
+        self.queue_depth -= 1
+        self.last_elapsed_ms = elapsed_ms
+        self.stats.emit(elapsed_ms, self.queue_depth)
+        self.recognized.emit(stroke_id, shape)
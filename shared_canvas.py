@@ -0,0 +1,342 @@
+import struct
+import sys
+import time
+from typing import List, Optional
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QSize, Qt, QTimer, QSharedMemory, pyqtSignal
+from PyQt5.QtGui import QImage
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+from screen_topology import CANVAS_FORMAT, native_size
+
+SHARED_KEY = "PyScreenSketch.canvas"
+MAGIC = b"PSSK"
+IMAGE_FORMAT = CANVAS_FORMAT
+
+HEADER_FMT = "<4sIIId"  # 魔数, 宽, 高 (物理像素), 每行字节数, 设备像素比
+HEADER_SIZE = 64
+RING_HEADER_FMT = "<III"  # 写指针, 读指针, 溢出标记
+RING_HEADER_SIZE = 16
+CMD_SLOTS = 64
+CMD_SLOT_SIZE = 64  # 单条命令最长字节数
+RESTART_DELAY = 500  # 画布进程崩溃后首次重启的延迟 (ms), 之后逐次翻倍
+MAX_RESTARTS = 5  # 连续崩溃超过该次数后不再重启
+STABLE_SECONDS = 30  # 运行超过该时长后再崩溃, 重新计数
+
+
+def screen_key(index: int) -> str:
+    return f"{SHARED_KEY}.{index}"
+
+
+def _align(value: int, alignment: int = 64) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def _layout(bytes_per_line: int, height: int):
+    """返回命令环偏移量、像素区偏移量和总大小"""
+    pixels = HEADER_SIZE + _align(RING_HEADER_SIZE + CMD_SLOTS * CMD_SLOT_SIZE)
+    return HEADER_SIZE, pixels, pixels + bytes_per_line * height
+
+
+class _Ring:
+    """单生产者单消费者环形缓冲区, 读写均在共享内存锁内完成"""
+
+    def __init__(self, buf: memoryview, offset: int, slots: int, slot_size: int):
+        self.buf = buf
+        self.offset = offset
+        self.slots = slots
+        self.slot_size = slot_size
+
+    def _slot(self, index: int) -> int:
+        return self.offset + RING_HEADER_SIZE + (index % self.slots) * self.slot_size
+
+    def push(self, data: bytes) -> bool:
+        head, tail, overflow = struct.unpack_from(
+            RING_HEADER_FMT, self.buf, self.offset
+        )
+        if head - tail >= self.slots:
+            struct.pack_into(RING_HEADER_FMT, self.buf, self.offset, head, tail, 1)
+            return False
+
+        start = self._slot(head)
+        self.buf[start : start + self.slot_size] = data.ljust(self.slot_size, b"\0")
+        struct.pack_into(
+            RING_HEADER_FMT, self.buf, self.offset, head + 1, tail, overflow
+        )
+        return True
+
+    def pop_all(self):
+        """取出全部数据, 返回 (数据列表, 是否发生过溢出)"""
+        head, tail, overflow = struct.unpack_from(
+            RING_HEADER_FMT, self.buf, self.offset
+        )
+        items = []
+        for index in range(tail, head):
+            start = self._slot(index)
+            items.append(bytes(self.buf[start : start + self.slot_size]))
+        struct.pack_into(RING_HEADER_FMT, self.buf, self.offset, head, head, 0)
+        return items, bool(overflow)
+
+
+class SharedCanvas(QObject):
+    """共享内存中的画布像素及工具栏到画布进程的命令通道
+
+    命令写入共享内存中的环形缓冲区, 再通过本地套接字发一个字节唤醒画布进程,
+    空闲时两个进程都不访问共享内存
+    """
+
+    command_received = pyqtSignal(str)
+
+    def __init__(self, key: str = SHARED_KEY) -> None:
+        super().__init__()
+        self.key = key
+        self.memory = QSharedMemory(key)
+        self.image: Optional[QImage] = None
+        self._ring: Optional[_Ring] = None
+        self._server: Optional[QLocalServer] = None  # 工具栏端
+        self._socket: Optional[QLocalSocket] = None  # 画布端
+
+    def create(self, size: QSize, dpr: float = 1.0) -> bool:
+        """由工具栏进程调用, 按屏幕原生分辨率分配共享内存并初始化"""
+        size = native_size(size, dpr)
+        bytes_per_line = size.width() * 4
+        _, _, total = _layout(bytes_per_line, size.height())
+
+        if not self.memory.create(total):
+            if self.memory.error() != QSharedMemory.AlreadyExists:
+                return False
+            # 上次崩溃遗留的段: 先挂上再释放, 由系统回收后重建
+            self.memory.attach()
+            self.memory.detach()
+            if not self.memory.create(total):
+                return False
+
+        self.memory.lock()
+        buf = self._buffer()
+        buf[:total] = bytes(total)  # 透明画布, 环形缓冲区清零
+        struct.pack_into(
+            HEADER_FMT, buf, 0, MAGIC, size.width(), size.height(), bytes_per_line, dpr
+        )
+        self.memory.unlock()
+
+        self._server = QLocalServer(self)
+        if not self._server.listen(self.key):
+            QLocalServer.removeServer(self.key)  # 清理上次崩溃遗留的套接字
+            self._server.listen(self.key)
+        self._server.newConnection.connect(self._handle_connection)
+
+        self._map()
+        return True
+
+    def attach(self) -> bool:
+        """由画布进程调用, 挂接到已有的共享内存"""
+        if not self.memory.attach():
+            return False
+        magic = struct.unpack_from(HEADER_FMT, self._buffer(), 0)[0]
+        if magic != MAGIC:
+            self.memory.detach()
+            return False
+
+        self._map()
+
+        self._socket = QLocalSocket(self)
+        self._socket.readyRead.connect(self._handle_ready_read)
+        # 取出画布进程重启期间积压的命令; 排队执行, 等调用方连接好 command_received
+        self._socket.connected.connect(self.poll, Qt.QueuedConnection)
+        self._socket.connectToServer(self.key)
+        return True
+
+    def detach(self) -> None:
+        if self._socket is not None:
+            self._socket.abort()
+        if self._server is not None:
+            self._server.close()
+        self.image = None
+        self._ring = None  # 解除映射后不再访问共享内存
+        if self.memory.isAttached():
+            self.memory.detach()
+
+    def _buffer(self) -> memoryview:
+        ptr = self.memory.data()
+        ptr.setsize(self.memory.size())
+        return memoryview(ptr)
+
+    def _map(self) -> None:
+        buf = self._buffer()
+        _, width, height, bytes_per_line, dpr = struct.unpack_from(HEADER_FMT, buf, 0)
+        ring, pixels, _ = _layout(bytes_per_line, height)
+        self._ring = _Ring(buf, ring, CMD_SLOTS, CMD_SLOT_SIZE)
+
+        # QImage 直接引用共享内存, 两个进程之间不做任何像素拷贝
+        address = int(self.memory.data()) + pixels
+        self.image = QImage(
+            sip.voidptr(address), width, height, bytes_per_line, IMAGE_FORMAT
+        )
+        self.image.setDevicePixelRatio(dpr)
+
+    def send_command(self, command: str) -> bool:
+        data = command.encode()
+        if len(data) > CMD_SLOT_SIZE:
+            raise ValueError("Command too long")
+        if self._ring is None:
+            return False
+
+        self.memory.lock()
+        try:
+            pushed = self._ring.push(data)
+        finally:
+            self.memory.unlock()
+
+        # 画布进程未连接时命令留在环中, 连接后统一取出
+        for socket in self._server.findChildren(QLocalSocket):
+            socket.write(b"\n")
+            socket.flush()  # 立即写出, 退出时事件循环已停止, 不会再替我们发送
+        return pushed
+
+    def _handle_connection(self) -> None:
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()  # 父对象为 server
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _handle_ready_read(self) -> None:
+        self._socket.readAll()  # 唤醒字节本身不携带数据
+        self.poll()
+
+    def poll(self) -> None:
+        if self._ring is None:
+            return
+
+        self.memory.lock()
+        try:
+            commands, _ = self._ring.pop_all()
+        finally:
+            self.memory.unlock()
+
+        for data in commands:
+            self.command_received.emit(data.rstrip(b"\0").decode())
+
+
+def run_overlay(argv: List[str]) -> int:
+    from PyQt5.QtWidgets import QApplication
+    from pen_and_erase_test import DrawingWidget
+    from screen_topology import topology
+
+    app = QApplication(argv)
+    index = int(argv[2])
+    shared = SharedCanvas(screen_key(index))
+    if not shared.attach():
+        print(f"Cannot attach shared canvas: {shared.memory.errorString()}")
+        return 1
+
+    overlay = DrawingWidget(canvas=shared.image)
+    overlay.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+    overlay.setAttribute(Qt.WA_TranslucentBackground)
+
+    def handle_command(command: str) -> None:
+        name, _, arg = command.partition(" ")
+        if name == "tool":
+            overlay.set_tool(arg)
+        elif name == "clear":
+            overlay.clear_canvas()
+        elif name == "quit":
+            app.quit()
+
+    shared.command_received.connect(handle_command)
+    app.aboutToQuit.connect(shared.detach)
+
+    screens = topology().screens
+    if index < len(screens):  # 全屏显示在对应屏幕上
+        overlay.setGeometry(screens[index].geometry)
+    overlay.showFullScreen()
+    return app.exec_()
+
+
+def run_toolbar(argv: List[str]) -> int:
+    from PyQt5.QtCore import QProcess
+    from PyQt5.QtGui import QKeySequence
+    from PyQt5.QtWidgets import QApplication, QShortcut
+    from screen_topology import topology
+    from toolbar_rebuild import ToolBar
+
+    app = QApplication(argv)
+    quitting = False
+    overlays = []  # (共享画布, 画布进程), 每块屏幕一组
+    restarts = {}  # 画布进程 -> (连续崩溃次数, 最近一次启动时间)
+
+    def start_overlay(process: QProcess) -> None:
+        if not quitting:
+            restarts[process] = (restarts[process][0], time.monotonic())
+            process.start()
+
+    # 每块屏幕单独分配原生分辨率的画布, 而不是整个虚拟桌面大小
+    for index, info in enumerate(topology().screens):
+        shared = SharedCanvas(screen_key(index))
+        if not shared.create(info.geometry.size(), info.dpr):
+            print(f"Cannot create shared canvas: {shared.memory.errorString()}")
+            return 1
+
+        process = QProcess()
+        process.setProcessChannelMode(QProcess.ForwardedChannels)
+
+        def restart_overlay(_, status, process=process, index=index) -> None:
+            # 只在崩溃时重启, 正常退出说明画布进程是被有意关闭的
+            if quitting or status != QProcess.CrashExit:
+                return
+
+            crashes, started = restarts[process]
+            if time.monotonic() - started > STABLE_SECONDS:
+                crashes = 0
+            if crashes >= MAX_RESTARTS:
+                print(f"Overlay {index} crashed {crashes} times, not restarting")
+                return
+
+            # 退避重启, 画布内容保留在共享内存中
+            restarts[process] = (crashes + 1, started)
+            QTimer.singleShot(RESTART_DELAY << crashes, lambda: start_overlay(process))
+
+        process.setProgram(sys.executable)
+        process.setArguments([__file__, "overlay", str(index)])
+        process.finished.connect(restart_overlay)
+        restarts[process] = (0, 0.0)
+        start_overlay(process)
+        overlays.append((shared, process))
+
+    def broadcast(command: str) -> None:
+        for shared, _ in overlays:
+            shared.send_command(command)
+
+    def stop_overlays() -> None:
+        nonlocal quitting
+        quitting = True
+        broadcast("quit")
+        for shared, process in overlays:
+            if not process.waitForFinished(1000):
+                process.kill()
+                process.waitForFinished()
+            shared.detach()
+
+    app.aboutToQuit.connect(stop_overlays)
+
+    tool_bar = ToolBar()
+    shortcuts = {
+        "P": "tool pen",
+        "E": "tool eraser",
+        "F": "tool fill",
+        "S": "tool select",
+        "L": "tool laser",
+        "C": "clear",
+    }
+    for key, command in shortcuts.items():
+        shortcut = QShortcut(QKeySequence(key), tool_bar)
+        shortcut.activated.connect(lambda c=command: broadcast(c))
+    QShortcut(QKeySequence("Esc"), tool_bar).activated.connect(app.quit)
+
+    tool_bar.show()
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["overlay"]:
+        sys.exit(run_overlay(sys.argv))
+    sys.exit(run_toolbar(sys.argv))
@@ -2,7 +2,7 @@ import sys
 import math
 from typing import Dict, Tuple, Optional, Union
 
-from PyQt5.QtWidgets import QWidget, QDesktopWidget, QApplication, QVBoxLayout
+from PyQt5.QtWidgets import QWidget, QApplication, QVBoxLayout
 from PyQt5.QtCore import (
     Qt,
     QPropertyAnimation,
@@ -12,9 +12,12 @@ from PyQt5.QtCore import (
     QEvent,
     QPoint,
     QPointF,
+    QRect,
 )
 from PyQt5.QtGui import QCursor
 
+from screen_topology import topology
+
 
 class ToolBar(QWidget):
     def __init__(self) -> None:
@@ -23,7 +26,8 @@ class ToolBar(QWidget):
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
 
-        self.scr_size = QDesktopWidget().screenGeometry()
+        self.screens = topology()  # 多屏几何缓存
+        self.scr_size = self.screens.primary.geometry
         self.scr_width = self.scr_size.width()
         self.scr_height = self.scr_size.height()
         self.scr_diagonal = math.sqrt(self.scr_width**2 + self.scr_height**2)
@@ -191,11 +195,16 @@ class ToolBar(QWidget):
         current_pos = pos if pos is not None else self.pos()
         current_size = size if size is not None else self.size()
 
+        rect = QRect(current_pos, current_size)
+        L_dist, T_dist, R_dist, B_dist = self.screens.margins(
+            rect, self.screens.screen_of(rect)  # 窗口所在屏幕
+        )
+
         return (
-            current_pos.x() - offset,  # 左距
-            current_pos.y() - offset,  # 上距
-            self.scr_width - current_pos.x() - current_size.width() - offset,  # 右距
-            self.scr_height - current_pos.y() - current_size.height() - offset,  # 下距
+            L_dist - offset,  # 左距
+            T_dist - offset,  # 上距
+            R_dist - offset,  # 右距
+            B_dist - offset,  # 下距
         )
 
     def _is_win_in_corner(self) -> Dict[str, bool]:
@@ -258,10 +267,8 @@ class ToolBar(QWidget):
         self._pos_offsets = [QPointF(x_remain, y_remain)]
         pos = self.pos() + QPoint(x_offset, y_offset)
 
-        new_x = max(0, min(pos.x(), self.scr_width - self.width()))
-        new_y = max(0, min(pos.y(), self.scr_height - self.height()))
-
-        self.move(new_x, new_y)
+        screen = self.screens.screen_of(QRect(pos, self.size()))  # 目标位置所在屏幕
+        self.move(self.screens.clamp(pos, self.size(), screen))
 
     def _perform_anim(
         self,
@@ -5,7 +5,6 @@ import time
 
 from PyQt5.QtWidgets import (
     QWidget,
-    QDesktopWidget,
     QApplication,
     QVBoxLayout,
     QGraphicsDropShadowEffect,
@@ -20,12 +19,15 @@ from PyQt5.QtCore import (
     QEvent,
     QPoint,
     QPointF,
+    QRect,
     QRectF,
     QSizeF,
     pyqtSignal,
 )
 from PyQt5.QtGui import QCursor, QPainter, QColor
 
+from screen_topology import topology
+
 
 class ToolBar(QWidget):
     def __init__(self) -> None:
@@ -35,11 +37,12 @@ class ToolBar(QWidget):
         self.setAttribute(Qt.WA_TranslucentBackground)  # 背景透明
         self.setAttribute(Qt.WA_NoSystemBackground, True)  # 优化性能
 
-        self.scr_size = QDesktopWidget().screenGeometry()
+        self.screens = topology()  # 多屏几何缓存
+        self.scr_size = self.screens.primary.geometry
         self.scr_w = self.scr_size.width()  # 屏幕宽度
         self.scr_h = self.scr_size.height()  # 屏幕高度
-        self.scr_center_x = self.scr_w * 0.5  # 屏幕中心X坐标
-        self.scr_center_y = self.scr_h * 0.5  # 屏幕中心Y坐标
+        self.scr_center_x = self.scr_size.x() + self.scr_w * 0.5  # 屏幕中心X坐标
+        self.scr_center_y = self.scr_size.y() + self.scr_h * 0.5  # 屏幕中心Y坐标
 
         self.unit_len = self.scr_h * 0.4
 
@@ -175,10 +178,9 @@ class ToolBar(QWidget):
             self.scale_offsets.clear()
             pos = pos + offsets
 
-        pos.setX(max(pos.x(), -self.cnt_frame_mg))
-        pos.setY(max(pos.y(), -self.cnt_frame_mg))
-        pos.setX(min(pos.x(), self.scr_w - self.w + self.cnt_frame_mg))
-        pos.setY(min(pos.y(), self.scr_h - self.h + self.cnt_frame_mg))
+        size = QSize(self.w, self.h)
+        screen = self.screens.screen_of(QRect(pos, size))  # 目标位置所在屏幕
+        pos = self.screens.clamp(pos, size, screen, self.cnt_frame_mg)
 
         self.setGeometry(pos.x(), pos.y(), self.w, self.h)
 